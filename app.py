@@ -3,18 +3,18 @@ import openai
 import json
 import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 import os
 from dataclasses import dataclass, asdict
 import uuid
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
 
-# Configure page
-st.set_page_config(
-    page_title="TalentScout - AI Hiring Assistant",
-    page_icon="🎯",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+logger = logging.getLogger(__name__)
 
 @dataclass
 class CandidateInfo:
@@ -29,6 +29,8 @@ class CandidateInfo:
     tech_stack: List[str] = None
     responses: Dict[str, str] = None
     timestamp: str = ""
+    duplicate_of: str = ""
+    duplicate_confirmed: bool = False
     
     def __post_init__(self):
         if self.tech_stack is None:
@@ -38,6 +40,282 @@ class CandidateInfo:
         if not self.timestamp:
             self.timestamp = datetime.now().isoformat()
 
+class CandidateIndex:
+    """Index of screening sessions used to flag candidates who apply twice"""
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        first_seen REAL NOT NULL,
+        last_seen REAL NOT NULL,
+        name_signature TEXT NOT NULL DEFAULT '[]',
+        answer_signature TEXT NOT NULL DEFAULT '[]',
+        duplicate_of TEXT,
+        duplicate_confirmed INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+    CREATE TABLE IF NOT EXISTS contact_keys (
+        contact_key TEXT NOT NULL,
+        session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+        PRIMARY KEY (contact_key, session_id)
+    );
+    CREATE INDEX IF NOT EXISTS contact_keys_session ON contact_keys (session_id);
+    CREATE TABLE IF NOT EXISTS name_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+        PRIMARY KEY (band, bucket, session_id)
+    );
+    CREATE INDEX IF NOT EXISTS name_buckets_session ON name_buckets (session_id);
+    """
+    
+    SCHEMA_VERSION = 2
+    MERSENNE_PRIME = (1 << 61) - 1
+    MAX_NAME_CHARS = 100
+    MAX_ANSWER_CHARS = 2000
+    MIN_ANSWER_SHINGLES = 6
+    MAX_CANDIDATES = 50
+    PRUNE_EVERY = 100
+    
+    def __init__(self, db_path: str = ":memory:", num_perm: int = 64, bands: int = 16,
+                 name_threshold: float = 0.8, answer_threshold: float = 0.6,
+                 ttl_seconds: int = 7 * 24 * 3600, max_sessions: int = 10000):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.name_threshold = name_threshold
+        self.answer_threshold = answer_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        
+        # Fixed seeds so signatures are comparable across restarts and processes
+        self.permutations = [
+            (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode()))
+            for i in range(num_perm)
+        ]
+        
+        self._updates = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if db_path != ":memory:":
+            # Several worker processes share the file in production mode
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        with self.conn:
+            # The index only holds derived data, so an outdated layout is rebuilt
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                self.conn.executescript(
+                    "DROP TABLE IF EXISTS name_buckets; DROP TABLE IF EXISTS contact_keys; "
+                    "DROP TABLE IF EXISTS sessions;"
+                )
+                self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self.conn.executescript(self.SCHEMA)
+    
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        """Canonical email key: lowercase, no +tag, no dots for Gmail"""
+        email = email.strip().lower()
+        if "@" not in email:
+            return ""
+        local, domain = email.rsplit("@", 1)
+        local = local.split("+", 1)[0]
+        if domain in ("gmail.com", "googlemail.com"):
+            local = local.replace(".", "")
+            domain = "gmail.com"
+        return f"{local}@{domain}" if local else ""
+    
+    @staticmethod
+    def normalize_phone(phone: str) -> str:
+        """Canonical phone key: digits only, national number without country code"""
+        digits = re.sub(r"\D", "", phone)
+        if len(digits) < 10:
+            return ""
+        return digits[-10:]
+    
+    def contact_keys(self, candidate_info: CandidateInfo) -> List[str]:
+        """Hashed exact-match keys for a candidate's contact details"""
+        keys = []
+        email = self.normalize_email(candidate_info.email)
+        if email:
+            keys.append(f"email:{email}")
+        phone = self.normalize_phone(candidate_info.phone)
+        if phone:
+            keys.append(f"phone:{phone}")
+        return [hashlib.sha256(key.encode()).hexdigest() for key in keys]
+    
+    def minhash(self, shingles: Set[str]) -> List[int]:
+        """MinHash signature of a set of shingles"""
+        if not shingles:
+            return []
+        hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+        return [
+            min((a * h + b) % self.MERSENNE_PRIME for h in hashes)
+            for a, b in self.permutations
+        ]
+    
+    def name_signature(self, full_name: str) -> List[int]:
+        """MinHash over character trigrams of the candidate's name"""
+        name = " ".join(re.findall(r"[a-z]+", full_name.lower()[:self.MAX_NAME_CHARS]))
+        if not name:
+            return []
+        name = f" {name} "
+        return self.minhash({name[i:i + 3] for i in range(len(name) - 2)})
+    
+    def answer_signature(self, answer: str) -> List[int]:
+        """MinHash over word bigrams of a single technical answer
+        
+        Short answers ("I don't know", "Not sure") are given by many candidates,
+        so they are left out of the signature entirely.
+        """
+        words = re.findall(r"[a-z0-9]+", answer.lower()[:self.MAX_ANSWER_CHARS])
+        shingles = {f"{a} {b}" for a, b in zip(words, words[1:])}
+        if len(shingles) < self.MIN_ANSWER_SHINGLES:
+            return []
+        return self.minhash(shingles)
+    
+    def similarity(self, first: List[int], second: List[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        if not first or not second:
+            return 0.0
+        return sum(x == y for x, y in zip(first, second)) / self.num_perm
+    
+    def band_keys(self, signature: List[int]) -> List[Tuple[int, int]]:
+        """LSH bucket keys, one per band of the signature"""
+        if not signature:
+            return []
+        return [
+            (band, zlib.crc32(",".join(map(str, signature[band * self.rows:(band + 1) * self.rows])).encode()))
+            for band in range(self.bands)
+        ]
+    
+    def update(self, candidate_info: CandidateInfo, stage: str, user_input: str):
+        """Fold the latest message into the session's entry
+        
+        Only answers to technical questions feed the answer signature; contact
+        details and stock answers (experience, position, location, tech stack)
+        are shared by too many candidates to tell them apart.
+        """
+        session_id = candidate_info.session_id
+        now = time.time()
+        name_signature = self.name_signature(candidate_info.full_name)
+        new_answer = self.answer_signature(user_input) if stage == "technical_questions" else []
+        
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT answer_signature FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            answer_signature = json.loads(row[0]) if row else []
+            if new_answer:
+                answer_signature = ([min(x, y) for x, y in zip(answer_signature, new_answer)]
+                                    if answer_signature else new_answer)
+            
+            self.conn.execute(
+                """INSERT INTO sessions (session_id, first_seen, last_seen, name_signature, answer_signature)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    name_signature = excluded.name_signature,
+                    answer_signature = excluded.answer_signature""",
+                (session_id, now, now, json.dumps(name_signature), json.dumps(answer_signature))
+            )
+            self.conn.execute("DELETE FROM contact_keys WHERE session_id = ?", (session_id,))
+            self.conn.executemany(
+                "INSERT INTO contact_keys (contact_key, session_id) VALUES (?, ?)",
+                [(key, session_id) for key in self.contact_keys(candidate_info)]
+            )
+            self.conn.execute("DELETE FROM name_buckets WHERE session_id = ?", (session_id,))
+            self.conn.executemany(
+                "INSERT INTO name_buckets (band, bucket, session_id) VALUES (?, ?, ?)",
+                [(band, bucket, session_id) for band, bucket in self.band_keys(name_signature)]
+            )
+            
+            self._updates += 1
+            if self._updates % self.PRUNE_EVERY == 0:
+                self._prune(now)
+    
+    def find_match(self, candidate_info: CandidateInfo) -> Tuple[Optional[str], bool]:
+        """Return (session_id, confirmed) of the earlier session this candidate duplicates
+        
+        Only sessions that started before this one are considered, so the
+        original application is never flagged as the copy. A match on contact
+        details is confirmed; a near-duplicate on name and answers is not.
+        """
+        session_id = candidate_info.session_id
+        
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT first_seen, name_signature, answer_signature FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            if not row:
+                return None, False
+            first_seen = row[0]
+            name_signature, answer_signature = json.loads(row[1]), json.loads(row[2])
+            
+            for key in self.contact_keys(candidate_info):
+                match = self.conn.execute(
+                    """SELECT c.session_id FROM contact_keys c JOIN sessions s USING (session_id)
+                    WHERE c.contact_key = ? AND (s.first_seen, s.session_id) < (?, ?)
+                    ORDER BY s.first_seen, s.session_id LIMIT 1""",
+                    (key, first_seen, session_id)
+                ).fetchone()
+                if match:
+                    return match[0], True
+            
+            # Near-duplicates need both a matching name and matching answers
+            buckets = self.band_keys(name_signature)
+            if not buckets or not answer_signature:
+                return None, False
+            
+            clauses = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(buckets))
+            params = [value for bucket in buckets for value in bucket]
+            rows = self.conn.execute(
+                f"""SELECT DISTINCT s.session_id, s.name_signature, s.answer_signature
+                FROM name_buckets b JOIN sessions s USING (session_id)
+                WHERE ({clauses}) AND (s.first_seen, s.session_id) < (?, ?)
+                LIMIT ?""",
+                params + [first_seen, session_id, self.MAX_CANDIDATES]
+            ).fetchall()
+        
+        best_id, best_score = None, 0.0
+        for other_id, other_name, other_answers in rows:
+            name_score = self.similarity(name_signature, json.loads(other_name))
+            answer_score = self.similarity(answer_signature, json.loads(other_answers))
+            if name_score < self.name_threshold or answer_score < self.answer_threshold:
+                continue
+            if name_score + answer_score > best_score:
+                best_id, best_score = other_id, name_score + answer_score
+        return best_id, False
+    
+    def record_duplicate(self, session_id: str, duplicate_of: str, confirmed: bool):
+        """Store a duplicate flag for recruiters; the first flag on a session wins"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                """UPDATE sessions SET duplicate_of = ?, duplicate_confirmed = ?
+                WHERE session_id = ? AND duplicate_of IS NULL""",
+                (duplicate_of, int(confirmed), session_id)
+            )
+        if cursor.rowcount:
+            logger.warning(
+                "Session %s is a %s duplicate of session %s",
+                session_id, "confirmed" if confirmed else "possible", duplicate_of
+            )
+    
+    def _prune(self, now: float):
+        """Expire idle sessions and cap the number of tracked sessions"""
+        self.conn.execute("DELETE FROM sessions WHERE last_seen < ?", (now - self.ttl_seconds,))
+        self.conn.execute(
+            """DELETE FROM sessions WHERE session_id IN (
+                SELECT session_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_sessions,)
+        )
+
+@st.cache_resource
+def get_candidate_index() -> CandidateIndex:
+    """Shared duplicate-candidate index, backed by TALENTSCOUT_INDEX_DB when set"""
+    return CandidateIndex(os.getenv("TALENTSCOUT_INDEX_DB", ":memory:"))
+
 class HiringAssistant:
     """AI-powered hiring assistant for TalentScout"""
     
@@ -195,9 +473,10 @@ class HiringAssistant:
         if any(keyword in user_input.lower() for keyword in ending_keywords):
             return self.get_conclusion_response(candidate_info)
         
-        # Use OpenAI API if available, otherwise use fallback logic
+        # Use OpenAI API if available, otherwise use fallback logic.
+        # Confirmed duplicates were already screened once, so don't pay for them again.
         try:
-            if os.getenv("OPENAI_API_KEY"):
+            if os.getenv("OPENAI_API_KEY") and not candidate_info.duplicate_confirmed:
                 return self.generate_openai_response(user_input, candidate_info, stage)
             else:
                 return self.generate_fallback_response(user_input, candidate_info, stage)
@@ -405,9 +684,22 @@ Best of luck with your job search! 🚀"""
             if found_techs:
                 candidate_info.tech_stack = list(set(candidate_info.tech_stack + found_techs))
 
+@st.cache_resource
+def get_hiring_assistant() -> HiringAssistant:
+    """Shared assistant and question bank; it holds no per-candidate state"""
+    return HiringAssistant()
+
 def main():
     """Main Streamlit application"""
     
+    # Configure page
+    st.set_page_config(
+        page_title="TalentScout - AI Hiring Assistant",
+        page_icon="🎯",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
     # Custom CSS for better styling
     st.markdown("""
     <style>
@@ -461,7 +753,9 @@ def main():
         st.session_state.current_stage = "greeting"
     
     if 'assistant' not in st.session_state:
-        st.session_state.assistant = HiringAssistant()
+        st.session_state.assistant = get_hiring_assistant()
+    
+    candidate_index = get_candidate_index()
     
     # Sidebar with candidate info
     with st.sidebar:
@@ -537,9 +831,17 @@ def main():
             user_input, st.session_state.candidate_info, st.session_state.current_stage
         )
         
-        # Update conversation stage based on collected information
+        # Flag candidates who already started a screening in another session
         candidate = st.session_state.candidate_info
+        candidate_index.update(candidate, st.session_state.current_stage, user_input)
+        if not candidate.duplicate_of:
+            match_id, confirmed = candidate_index.find_match(candidate)
+            if match_id:
+                candidate.duplicate_of = match_id
+                candidate.duplicate_confirmed = confirmed
+                candidate_index.record_duplicate(candidate.session_id, match_id, confirmed)
         
+        # Update conversation stage based on collected information
         if st.session_state.current_stage == "greeting" and candidate.full_name:
             st.session_state.current_stage = "basic_info"
         elif (st.session_state.current_stage == "basic_info" and 
@@ -4,12 +4,30 @@ TalentScout AI Hiring Assistant - Automated Runner
 This script automatically sets up and runs the hiring assistant application.
 """
 
+import argparse
+import asyncio
+import http.client
+import importlib.metadata
+import operator
+import re
+import signal
+import socket
 import subprocess
 import sys
 import os
 import time
+import urllib.request
+import zlib
 from pathlib import Path
 
+APP_PATH = Path(__file__).resolve().parent / "app.py"
+WORKER_ENTRY_PATH = Path(__file__).resolve().parent / "serve_app.py"
+INDEX_DB_PATH = Path(__file__).resolve().parent / "candidate_index.db"
+REQUIREMENTS_PATH = Path(__file__).resolve().parent / "requirements.txt"
+HEALTH_CHECK_INTERVAL = 5
+HEALTH_CHECK_FAILURES = 3
+WORKER_STARTUP_TIMEOUT = 60
+
 def check_python_version():
     """Check if Python version is compatible"""
     if sys.version_info < (3, 8):
@@ -19,6 +37,56 @@ def check_python_version():
     print(f"✅ Python version: {sys.version.split()[0]}")
     return True
 
+VERSION_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+def parse_version(version, length=3):
+    """Turn the release part of a version string into a comparable tuple of ints"""
+    match = re.match(r"\d+(?:\.\d+)*", version.strip())
+    if not match:
+        return None
+    parts = [int(part) for part in match.group().split(".")]
+    return tuple(parts + [0] * (length - len(parts)))
+
+def requirements_satisfied():
+    """Check whether every requirement is already installed
+    
+    Only plain "name<op>version" specifiers are understood; anything else
+    (extras, markers, URLs, ~= and friends) counts as unsatisfied so that
+    pip gets to decide.
+    """
+    for line in REQUIREMENTS_PATH.read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        match = re.fullmatch(r"([A-Za-z0-9_.\-]+)\s*(.*)", line)
+        name, specifiers = match.groups() if match else (None, "")
+        if not name:
+            return False
+        try:
+            installed = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            return False
+        
+        for specifier in filter(None, (part.strip() for part in specifiers.split(","))):
+            spec = re.fullmatch(r"(>=|<=|==|!=|>|<)\s*(\d+(?:\.\d+)*)", specifier)
+            if not spec:
+                return False
+            op, required = spec.groups()
+            length = max(len(required.split(".")), len(installed.split(".")), 3)
+            installed_version = parse_version(installed, length)
+            if installed_version is None:
+                return False
+            if not VERSION_OPERATORS[op](installed_version, parse_version(required, length)):
+                return False
+    return True
+
 def install_requirements():
     """Install required packages"""
     print("📦 Installing required packages...")
@@ -60,8 +128,267 @@ def run_application():
     except Exception as e:
         print(f"❌ Error running application: {e}")
 
+def streamlit_args(port, headless=True):
+    """Command line for serving the worker entry point on a local port"""
+    return [
+        "streamlit", "run", str(WORKER_ENTRY_PATH),
+        "--server.port", str(port),
+        "--server.address", "127.0.0.1",
+        "--server.headless", "true" if headless else "false",
+        "--browser.gatherUsageStats", "false",
+    ]
+
+def warm_worker():
+    """Import the app and build its shared resources before serving traffic"""
+    sys.path.insert(0, str(APP_PATH.parent))
+    import app
+    app.get_hiring_assistant()
+    app.get_candidate_index()
+
+def run_worker(port):
+    """Serve a single warmed-up app instance (used by production mode)"""
+    warm_worker()
+    from streamlit.web import cli as stcli
+    sys.argv = streamlit_args(port)
+    sys.exit(stcli.main())
+
+class AppWorker:
+    """A Streamlit worker process behind the production proxy"""
+    
+    def __init__(self, port, index_db):
+        self.port = port
+        self.index_db = index_db
+        self.process = None
+        self.ready = False
+        self.failures = 0
+        self.started_at = 0.0
+        self.restarting = False
+    
+    def start(self):
+        """Spawn the worker process"""
+        self.ready = False
+        self.failures = 0
+        self.started_at = time.time()
+        self.process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--worker", "--port", str(self.port)],
+            env={**os.environ, "TALENTSCOUT_INDEX_DB": str(self.index_db)},
+            # Own process group: terminal signals reach only the launcher,
+            # which then shuts the workers down itself
+            start_new_session=True,
+        )
+    
+    def send_signal(self, sig):
+        """Send a signal to the worker's whole process group"""
+        if os.name == "posix":
+            try:
+                os.killpg(self.process.pid, sig)
+            except ProcessLookupError:
+                pass
+        elif sig == signal.SIGTERM:
+            self.process.terminate()
+        else:
+            self.process.kill()
+    
+    def stop(self):
+        """Terminate the worker process"""
+        self.ready = False
+        if self.process and self.process.poll() is None:
+            self.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.send_signal(getattr(signal, "SIGKILL", signal.SIGTERM))
+                self.process.wait()
+    
+    def alive(self):
+        """Return True if the worker process is running"""
+        return self.process is not None and self.process.poll() is None
+    
+    def probe(self, path="/_stcore/health"):
+        """Return True if the worker answers an HTTP request"""
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}", timeout=2) as response:
+                response.read()
+                return response.status == 200
+        except (OSError, http.client.HTTPException):
+            # Refused or timed out, or a garbled / truncated response
+            return False
+    
+    def starting(self):
+        """Return True while the worker is still inside its startup window"""
+        return self.alive() and time.time() - self.started_at < WORKER_STARTUP_TIMEOUT
+    
+    def wait_until_ready(self):
+        """Block until the worker answers its health check"""
+        deadline = self.started_at + WORKER_STARTUP_TIMEOUT
+        while time.time() < deadline and self.alive():
+            if self.probe():
+                self.ready = True
+                return True
+            time.sleep(0.5)
+        return False
+    
+    def restart(self):
+        """Replace the worker process and wait for the new one to come up"""
+        self.stop()
+        self.start()
+        return self.wait_until_ready()
+
+class AffinityProxy:
+    """Local TCP proxy that pins each client address to one worker
+    
+    Streamlit keeps session state in the worker process, so a websocket that
+    reconnects after a network blip must land on the same worker again. When
+    a client's worker is down the next ready one takes over.
+    """
+    
+    def __init__(self, workers):
+        self.workers = workers
+    
+    def candidates(self, client_host):
+        """Ready workers for a client, its own worker first"""
+        start = zlib.crc32(client_host.encode()) % len(self.workers)
+        for offset in range(len(self.workers)):
+            worker = self.workers[(start + offset) % len(self.workers)]
+            if worker.ready:
+                yield worker
+    
+    async def handle_client(self, client_reader, client_writer):
+        peername = client_writer.get_extra_info("peername")
+        client_host = peername[0] if peername else ""
+        for worker in self.candidates(client_host):
+            try:
+                upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+            except OSError:
+                worker.ready = False
+                continue
+            await asyncio.gather(
+                self._pipe(client_reader, upstream_writer),
+                self._pipe(upstream_reader, client_writer),
+            )
+            return
+        client_writer.close()
+    
+    @staticmethod
+    async def _pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+async def restart_worker(worker):
+    """Restart a worker off the event loop so the proxy keeps serving"""
+    worker.restarting = True
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, worker.restart)
+    finally:
+        worker.restarting = False
+
+async def supervise_workers(workers):
+    """Health-check workers and restart any that die or stop responding"""
+    restarts = set()
+    while True:
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+        for worker in workers:
+            try:
+                await check_worker(worker, restarts)
+            except Exception as e:
+                # One misbehaving worker must not end supervision of the others
+                worker.ready = False
+                print(f"⚠️ Health check for worker on port {worker.port} failed: {e}")
+
+async def check_worker(worker, restarts):
+    """Probe one worker, taking it out of rotation or restarting it as needed"""
+    loop = asyncio.get_running_loop()
+    if worker.restarting or (not worker.ready and worker.starting()):
+        return
+    if worker.alive() and await loop.run_in_executor(None, worker.probe):
+        worker.failures = 0
+        worker.ready = True
+        return
+    # Take the worker out of rotation straight away, restart it later
+    worker.ready = False
+    worker.failures += 1
+    if worker.alive() and worker.failures < HEALTH_CHECK_FAILURES:
+        return
+    print(f"⚠️ Worker on port {worker.port} is unhealthy, restarting")
+    task = asyncio.create_task(restart_worker(worker))
+    restarts.add(task)
+    task.add_done_callback(restarts.discard)
+
+def port_in_use(port):
+    """Return True if something already listens on a local port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+async def serve_production(workers, port):
+    """Start and warm all workers, then serve traffic through the proxy"""
+    loop = asyncio.get_running_loop()
+    try:
+        # Let SIGTERM (systemd, docker stop) unwind like Ctrl+C so workers get stopped
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass  # Windows
+    
+    # A leftover worker would answer our health checks in place of the new one
+    busy = [worker.port for worker in workers if port_in_use(worker.port)]
+    if busy:
+        print(f"❌ Worker ports already in use: {', '.join(map(str, busy))}")
+        print("Stop the previous launcher or choose another --port")
+        return
+    
+    for worker in workers:
+        await loop.run_in_executor(None, worker.start)
+    ready = await asyncio.gather(*(loop.run_in_executor(None, w.wait_until_ready) for w in workers))
+    if not any(ready):
+        print("❌ No worker became healthy, aborting")
+        return
+    print(f"✅ {sum(ready)}/{len(workers)} workers ready")
+    
+    proxy = AffinityProxy(workers)
+    server = await asyncio.start_server(proxy.handle_client, "0.0.0.0", port)
+    print(f"🔗 URL: http://localhost:{port}")
+    print("Press Ctrl+C to stop the application")
+    async with server:
+        await asyncio.gather(server.serve_forever(), supervise_workers(workers))
+
+def run_production(num_workers, port, index_db):
+    """Run several app workers behind a client-affinity proxy"""
+    print(f"🚀 Starting TalentScout AI Hiring Assistant with {num_workers} workers...")
+    workers = [AppWorker(port + i + 1, index_db) for i in range(num_workers)]
+    try:
+        asyncio.run(serve_production(workers, port))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n👋 Application stopped")
+    finally:
+        for worker in workers:
+            worker.stop()
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Set up and run the TalentScout AI Hiring Assistant")
+    parser.add_argument("--prod", action="store_true",
+                        help="run multiple workers behind a local load-balancing proxy")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of app workers in production mode (default: CPU count)")
+    parser.add_argument("--port", type=int, default=8501,
+                        help="public port; workers listen on the following ports")
+    parser.add_argument("--index-db", type=Path, default=INDEX_DB_PATH,
+                        help="SQLite file for the duplicate-candidate index shared by workers")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
 def main():
     """Main execution function"""
+    args = parse_args()
+    if args.worker:
+        run_worker(args.port)
+        return
+    
     print("🎯 TalentScout AI Hiring Assistant - Setup & Run")
     print("=" * 50)
     
@@ -75,8 +402,10 @@ def main():
     if not check_python_version():
         return
     
-    # Install requirements
-    if not install_requirements():
+    # Install requirements unless they are already satisfied
+    if requirements_satisfied():
+        print("✅ Requirements already satisfied, skipping install")
+    elif not install_requirements():
         return
     
     # Check Streamlit installation
@@ -84,7 +413,10 @@ def main():
         return
     
     # Run the application
-    run_application()
+    if args.prod:
+        run_production(max(1, args.workers), args.port, args.index_db.resolve())
+    else:
+        run_application()
 
 if __name__ == "__main__":
     main()
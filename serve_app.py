@@ -0,0 +1,9 @@
+"""
+Streamlit entry point for production workers started by run.py.
+Importing app keeps it in sys.modules, so the resources run.py warms up
+before a worker takes traffic are the same ones every session uses.
+"""
+
+from app import main
+
+main()